@@ -1,10 +1,21 @@
 # main.py - Your FastAPI application for Render
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect
+from fastapi import Response, Query, Request, Depends
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
-import requests
+from starlette.middleware.gzip import GZipMiddleware
+from typing import Optional, Dict, Any, Annotated
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import count
+from bisect import bisect_right
+import asyncio
+from cachetools import TTLCache
+import httpx
+import msgspec
+import orjson
+import redis.asyncio as redis
 import json
 import os
 import time
@@ -16,32 +27,95 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# In-memory storage (replace with database in production)
-video_requests_db = {}
-
-# Pydantic models for request/response validation
-class VideoGenerationRequest(BaseModel):
-    script_text: str = Field(..., min_length=1, max_length=5000, description="Text for the AI to speak (REQUIRED)")
-    template_id: Optional[str] = Field(default=None, description="HeyGen template ID (optional)")
-    use_captions: Optional[bool] = Field(default=False, description="Whether to enable captions")
-    avatar_id: Optional[str] = Field(default="283a8bced1f841c7a9292a9212019165", description="Avatar character ID")
-    voice_id: Optional[str] = Field(default="fc3a1b6d218246d39ff5199ab147d6ee", description="Voice ID")
-    background_url: Optional[str] = Field(default="https://static.heygen.ai/tmp_resource/7fba946a-b927-4bc9-b754-84e28c5546da", description="Background image URL")
-    title: Optional[str] = Field(default="Render_API_Video", description="Video title")
-    width: Optional[int] = Field(default=1280, description="Video width")
-    height: Optional[int] = Field(default=720, description="Video height")
-
-class VideoGenerationResponse(BaseModel):
+# Stored requests expire after REQUEST_TTL_SEC, in Redis and in memory
+REQUEST_TTL_SEC = int(os.getenv("REQUEST_TTL_SEC", "86400"))
+MAX_CACHED_REQUESTS = int(os.getenv("MAX_CACHED_REQUESTS", "10000"))
+
+# In-memory storage, used when REDIS_URL is not set (per-process only)
+video_requests_db: TTLCache = TTLCache(maxsize=MAX_CACHED_REQUESTS, ttl=REQUEST_TTL_SEC)
+video_id_to_request_id: TTLCache = TTLCache(maxsize=MAX_CACHED_REQUESTS, ttl=REQUEST_TTL_SEC)
+
+# Creation order for /requests paging; cursors are sequence numbers, so re-saving or
+# expiring records doesn't shift later pages. Expired ids are pruned lazily.
+_request_seq = count(1)
+request_seq_by_id: TTLCache = TTLCache(maxsize=MAX_CACHED_REQUESTS, ttl=REQUEST_TTL_SEC)
+_order_seqs: list = []
+_order_ids: list = []
+
+# Shared Redis store, created in lifespan when REDIS_URL is set
+redis_client = None
+
+# WebSocket subscribers and background status pollers, keyed by request_id
+subscribers: Dict[str, set] = {}
+status_pollers: Dict[str, asyncio.Task] = {}
+
+# Short-lived HeyGen status cache and in-flight lookups, keyed by video_id
+_status_cache: Dict[str, tuple] = {}
+_status_inflight: Dict[str, asyncio.Future] = {}
+
+# Stored metadata for each generation request
+@dataclass(slots=True)
+class VideoRequestRecord:
+    video_id: Optional[str]
+    script_text: str
+    template_id: str
+    use_captions: Optional[bool]
+    avatar_id: Optional[str]
+    voice_id: Optional[str]
+    title: Optional[str]
+    created_at: str
+    status: str
+    platform: str = "render"
+    # Filled in once HeyGen reports completed/failed
+    video_url: Optional[str] = None
+    caption_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    duration: Optional[float] = None
+    video_created_at: Optional[str] = None
+    error_message: Optional[str] = None
+    
+    @property
+    def terminal(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+    
+    @classmethod
+    def from_request(cls, request: "VideoGenerationRequest", video_id: Optional[str], status: str) -> "VideoRequestRecord":
+        return cls(
+            video_id=video_id,
+            script_text=request.script_text,
+            template_id=request.template_id or TEMPLATE_ID,
+            use_captions=request.use_captions,
+            avatar_id=request.avatar_id,
+            voice_id=request.voice_id,
+            title=request.title,
+            created_at=now_iso(),
+            status=status
+        )
+
+# msgspec schemas for request/response validation and encoding
+class VideoGenerationRequest(msgspec.Struct):
+    script_text: Annotated[str, msgspec.Meta(min_length=1, max_length=5000, description="Text for the AI to speak (REQUIRED)")]
+    template_id: Annotated[Optional[str], msgspec.Meta(description="HeyGen template ID (optional)")] = None
+    use_captions: Annotated[Optional[bool], msgspec.Meta(description="Whether to enable captions")] = False
+    avatar_id: Annotated[Optional[str], msgspec.Meta(description="Avatar character ID")] = "283a8bced1f841c7a9292a9212019165"
+    voice_id: Annotated[Optional[str], msgspec.Meta(description="Voice ID")] = "fc3a1b6d218246d39ff5199ab147d6ee"
+    background_url: Annotated[Optional[str], msgspec.Meta(description="Background image URL")] = "https://static.heygen.ai/tmp_resource/7fba946a-b927-4bc9-b754-84e28c5546da"
+    title: Annotated[Optional[str], msgspec.Meta(description="Video title")] = "Render_API_Video"
+    width: Annotated[Optional[int], msgspec.Meta(description="Video width")] = 1280
+    height: Annotated[Optional[int], msgspec.Meta(description="Video height")] = 720
+
+class VideoGenerationResponse(msgspec.Struct):
     success: bool
     message: str
     request_id: str
     video_id: Optional[str] = None
     estimated_time: Optional[str] = None
 
-class VideoRetrievalRequest(BaseModel):
-    video_id: str
+class VideoRetrievalRequest(msgspec.Struct):
+    video_id: Optional[str] = None
+    request_id: Optional[str] = None
 
-class VideoRetrievalResponse(BaseModel):
+class VideoRetrievalResponse(msgspec.Struct):
     success: bool
     message: str
     request_id: Optional[str] = None
@@ -53,97 +127,233 @@ class VideoRetrievalResponse(BaseModel):
     duration: Optional[float] = None
     created_at: Optional[str] = None
 
+def json_body(schema: type):
+    """Dependency that decodes and validates the JSON request body into a msgspec schema"""
+    async def decode(request: Request):
+        try:
+            return msgspec.json.decode(await request.body(), type=schema)
+        except msgspec.DecodeError as e:
+            raise HTTPException(status_code=422, detail=f"Invalid request body: {e}")
+    return decode
+
+# FastAPI can't introspect msgspec schemas, so /docs gets their JSON schema explicitly
+def _json_schema(schema: type) -> Dict[str, Any]:
+    return msgspec.json.schema(schema)["$defs"][schema.__name__]
+
+def openapi_body(schema: type) -> Dict[str, Any]:
+    """OpenAPI requestBody for a msgspec schema"""
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": _json_schema(schema)}}}}
+
+def openapi_response(schema: type) -> Dict[int, Any]:
+    """OpenAPI 200 response for a msgspec schema"""
+    return {200: {"description": "Successful Response", "content": {"application/json": {"schema": _json_schema(schema)}}}}
+
+def struct_response(obj: msgspec.Struct, headers: Optional[Dict[str, str]] = None) -> Response:
+    return Response(msgspec.json.encode(obj), media_type="application/json", headers=headers)
+
+def encode_status(message: Dict[str, Any]) -> str:
+    """Encode a status message with the same shape /retrieve returns"""
+    return msgspec.json.encode(VideoRetrievalResponse(**message)).decode()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared HeyGen and Redis clients on startup and close them on shutdown"""
+    global heygen_service, redis_client
+    if HEYGEN_API_KEY:
+        app.state.http = create_heygen_client(HEYGEN_API_KEY)
+        heygen_service = HeyGenService(app.state.http)
+    if REDIS_URL:
+        redis_client = redis.from_url(REDIS_URL, decode_responses=True)
+    render_health(app)
+    health_refresher = asyncio.create_task(refresh_health(app))
+    yield
+    health_refresher.cancel()
+    for task in list(status_pollers.values()):
+        task.cancel()
+    if heygen_service:
+        await app.state.http.aclose()
+        heygen_service = None
+    if redis_client:
+        await redis_client.aclose()
+        redis_client = None
+
 # Initialize FastAPI app
 app = FastAPI(
     title="HeyGen Video Generation API",
     description="API service for generating AI videos using HeyGen - Deployed on Render",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
-# Add CORS middleware
+# Reject oversized /generate bodies before they are read in full. Registered first so
+# CORS wraps it and its 413/400 responses still carry CORS headers.
+MAX_GENERATE_BODY_BYTES = 16384
+
+class _BodyTooLarge(Exception):
+    pass
+
+class BodySizeLimitMiddleware:
+    """Plain ASGI middleware, so it doesn't buffer responses or delay background tasks"""
+    
+    def __init__(self, app, path: str, max_bytes: int):
+        self.app = app
+        self.path = path
+        self.max_bytes = max_bytes
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != self.path:
+            return await self.app(scope, receive, send)
+        
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None:
+            try:
+                too_large = int(content_length) > self.max_bytes
+            except ValueError:
+                return await self._reject(scope, receive, send, 400, "Invalid Content-Length header")
+            if too_large:
+                return await self._reject(scope, receive, send, 413, "Request body too large")
+            return await self.app(scope, receive, send)
+        
+        # No Content-Length (chunked upload): count body bytes as the app reads them
+        received = 0
+        response_started = False
+        
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise _BodyTooLarge()
+            return message
+        
+        async def tracked_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+        
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except _BodyTooLarge:
+            if response_started:
+                raise
+            await self._reject(scope, receive, send, 413, "Request body too large")
+    
+    async def _reject(self, scope, receive, send, status_code: int, message: str):
+        response = ORJSONResponse(
+            status_code=status_code,
+            content={"success": False, "message": message, "status_code": status_code, "platform": "Render"}
+        )
+        await response(scope, receive, send)
+
+app.add_middleware(BodySizeLimitMiddleware, path="/generate", max_bytes=MAX_GENERATE_BODY_BYTES)
+
+# Add CORS middleware - browser origins must be listed in CORS_ORIGINS (comma-separated);
+# none are allowed by default, and a "*" wildcard never gets credentials
+CORS_ORIGINS = [origin.strip() for origin in os.getenv("CORS_ORIGINS", "").split(",") if origin.strip()]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=CORS_ORIGINS,
+    allow_credentials="*" not in CORS_ORIGINS,
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type", "x-api-key"],
+    max_age=86400,  # Let browsers cache preflight responses for a day
 )
 
+# Compress larger responses such as the /requests listing; small ones are sent as-is
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Configuration - Render automatically provides these via environment variables
 HEYGEN_API_KEY = os.getenv("HEYGEN_API_KEY")
 TEMPLATE_ID = os.getenv("TEMPLATE_ID", "52df47c0bd8e435c9729121e036d2e7f")  # Can be customized per request
 PORT = int(os.getenv("PORT", 8000))
+REDIS_URL = os.getenv("REDIS_URL")  # Required when running more than one worker
+REDIS_ORDER_KEY = "requests:order"
+REDIS_SEQ_KEY = "requests:seq"
+STATUS_POLL_INTERVAL_SEC = 5
+QUEUED_POLL_INTERVAL_SEC = 1
+STATUS_POLL_MAX_SEC = 3600
+TERMINAL_STATUSES = {"completed", "failed"}
+STATUS_CACHE_TTL_SEC = 3
+STATUS_CACHE_MAX_ENTRIES = 1024
+TERMINAL_CACHE_CONTROL = "public, max-age=31536000, immutable"
 
 if not HEYGEN_API_KEY:
     logger.warning("HEYGEN_API_KEY environment variable not set")
 
+# ISO timestamp cached for up to a second, so hot endpoints don't format one per request
+_ts_cache = [0.0, ""]
+
+def now_iso() -> str:
+    t = time.time()
+    if t - _ts_cache[0] >= 1.0:
+        _ts_cache[0] = t
+        _ts_cache[1] = datetime.fromtimestamp(t).isoformat()
+    return _ts_cache[1]
+
+# Static parts of the HeyGen template payload; only per-request fields are filled in
+_PAYLOAD_TEMPLATE = {"include_gif": False, "enable_sharing": True}
+_VARIABLE_TEMPLATES = (
+    # (variable name, variable type, static properties, property key, request field)
+    ("voice_id", "voice", {"locale": None}, "voice_id", "voice_id"),
+    ("avatar_id", "character", {"type": "talking_photo"}, "character_id", "avatar_id"),
+    ("background_id", "image", {"asset_id": None, "fit": "none"}, "url", "background_url"),
+    ("script_content", "text", {}, "content", "script_text"),
+)
+
+def _build_payload(request: VideoGenerationRequest) -> Dict[str, Any]:
+    """Build the HeyGen template generate payload for a request"""
+    variables = {}
+    for name, var_type, static_props, prop_key, field in _VARIABLE_TEMPLATES:
+        properties = static_props.copy()
+        properties[prop_key] = getattr(request, field)
+        variables[name] = {"name": name, "type": var_type, "properties": properties}
+    
+    payload = _PAYLOAD_TEMPLATE.copy()
+    payload["caption"] = request.use_captions
+    payload["dimension"] = {"width": request.width, "height": request.height}
+    payload["title"] = request.title
+    payload["variables"] = variables
+    return payload
+
+@lru_cache(maxsize=128)
+def _generate_path(template_id: str) -> str:
+    return f"/v2/template/{template_id}/generate"
+
+def create_heygen_client(api_key: str) -> httpx.AsyncClient:
+    """Create the long-lived HTTP/2 client shared by all HeyGen calls"""
+    return httpx.AsyncClient(
+        base_url="https://api.heygen.com",
+        http2=True,
+        timeout=httpx.Timeout(30.0, connect=5.0),
+        limits=httpx.Limits(max_keepalive_connections=100, max_connections=200, keepalive_expiry=60.0),
+        headers={
+            "accept": "application/json",
+            "content-type": "application/json",
+            "x-api-key": api_key
+        }
+    )
+
 class HeyGenService:
     """Service class for HeyGen API interactions"""
     
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-        self.base_url = "https://api.heygen.com"
+    def __init__(self, client: httpx.AsyncClient):
+        # Pooled client owned by the app lifespan, so connections are reused across calls
+        self._client = client
     
-    def generate_video(self, request: VideoGenerationRequest) -> Dict[str, Any]:
+    async def generate_video(self, request: VideoGenerationRequest) -> Dict[str, Any]:
         """Generate video using HeyGen API"""
         # Use template_id from request or fall back to environment default
         template_id = request.template_id or TEMPLATE_ID
         
-        url = f"{self.base_url}/v2/template/{template_id}/generate"
+        url = _generate_path(template_id)
         
-        headers = {
-            "accept": "application/json",
-            "content-type": "application/json",
-            "x-api-key": self.api_key
-        }
-        
-        payload = {
-            "caption": request.use_captions,
-            "dimension": {
-                "width": request.width,
-                "height": request.height
-            },
-            "include_gif": False,
-            "title": request.title,
-            "variables": {
-                "voice_id": {
-                    "name": "voice_id",
-                    "type": "voice",
-                    "properties": {
-                        "voice_id": request.voice_id,
-                        "locale": None
-                    }
-                },
-                "avatar_id": {
-                    "name": "avatar_id",
-                    "type": "character",
-                    "properties": {
-                        "character_id": request.avatar_id,
-                        "type": "talking_photo"
-                    }
-                },
-                "background_id": {
-                    "name": "background_id",
-                    "type": "image",
-                    "properties": {
-                        "url": request.background_url,
-                        "asset_id": None,
-                        "fit": "none"
-                    }
-                },
-                "script_content": {
-                    "name": "script_content",
-                    "type": "text",
-                    "properties": {
-                        "content": request.script_text
-                    }
-                }
-            },
-            "enable_sharing": True
-        }
+        payload = orjson.dumps(_build_payload(request))
         
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
+            response = await self._client.post(url, content=payload)
             
             if response.status_code != 200:
                 logger.error(f"HeyGen API error: {response.status_code} - {response.text}")
@@ -154,27 +364,22 @@ class HeyGenService:
             
             return response.json()
             
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             raise HTTPException(status_code=408, detail="Request timeout")
-        except requests.exceptions.ConnectionError:
+        except httpx.ConnectError:
             raise HTTPException(status_code=503, detail="Service unavailable")
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Request error: {e}")
             raise HTTPException(status_code=500, detail=f"Request failed: {str(e)}")
     
-    def get_video_status(self, video_id: str) -> Dict[str, Any]:
+    async def get_video_status(self, video_id: str) -> Dict[str, Any]:
         """Get video status from HeyGen API"""
-        url = f"{self.base_url}/v1/video_status.get"
-        
-        headers = {
-            "X-Api-Key": self.api_key,
-            "Content-Type": "application/json"
-        }
+        url = "/v1/video_status.get"
         
         params = {"video_id": video_id}
         
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=15)
+            response = await self._client.get(url, params=params, timeout=httpx.Timeout(15.0, connect=5.0))
             
             if response.status_code != 200:
                 logger.error(f"HeyGen API error: {response.status_code} - {response.text}")
@@ -185,11 +390,11 @@ class HeyGenService:
             
             return response.json()
             
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             raise HTTPException(status_code=408, detail="Request timeout")
-        except requests.exceptions.ConnectionError:
+        except httpx.ConnectError:
             raise HTTPException(status_code=503, detail="Service unavailable")
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Request error: {e}")
             raise HTTPException(status_code=500, detail=f"Request failed: {str(e)}")
 
@@ -197,39 +402,351 @@ class HeyGenService:
 heygen_service = None
 
 def get_heygen_service():
-    global heygen_service
-    if not heygen_service and HEYGEN_API_KEY:
-        heygen_service = HeyGenService(HEYGEN_API_KEY)
+    # Created in lifespan together with the shared HTTP client
     return heygen_service
 
-# API Routes
-@app.get("/", tags=["Health"])
-async def root():
-    """Health check endpoint"""
+# Request storage - Redis when configured, in-memory dict otherwise
+async def save_request(request_id: str, record: VideoRequestRecord, created: bool = False):
+    """Store request metadata and index it by video_id (and by creation order when created)"""
+    if redis_client:
+        # Creation-order sequence for /requests paging, shared by all workers
+        seq = await redis_client.incr(REDIS_SEQ_KEY) if created else None
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.set(f"req:{request_id}", orjson.dumps(record), ex=REQUEST_TTL_SEC)
+        if record.video_id:
+            pipe.set(f"vid:{record.video_id}", request_id, ex=REQUEST_TTL_SEC)
+        if seq is not None:
+            pipe.zadd(REDIS_ORDER_KEY, {request_id: seq}, nx=True)
+        await pipe.execute()
+    else:
+        video_requests_db[request_id] = record
+        seq = request_seq_by_id.get(request_id)
+        if seq is None:
+            seq = next(_request_seq)
+            _order_seqs.append(seq)
+            _order_ids.append(request_id)
+            if len(_order_ids) > 2 * MAX_CACHED_REQUESTS:
+                _prune_request_order()
+        # Re-set on every save so the sequence expires together with the record
+        request_seq_by_id[request_id] = seq
+        if record.video_id:
+            video_id_to_request_id[record.video_id] = request_id
+
+async def load_request(request_id: str) -> Optional[VideoRequestRecord]:
+    """Get request metadata by request_id"""
+    if redis_client:
+        raw = await redis_client.get(f"req:{request_id}")
+        return VideoRequestRecord(**orjson.loads(raw)) if raw else None
+    return video_requests_db.get(request_id)
+
+async def find_request_id(video_id: str) -> Optional[str]:
+    """Look up the request_id that produced a video_id"""
+    if redis_client:
+        return await redis_client.get(f"vid:{video_id}")
+    return video_id_to_request_id.get(video_id)
+
+def _prune_request_order():
+    """Drop expired request ids from the paging order"""
+    live = [(seq, rid) for seq, rid in zip(_order_seqs, _order_ids) if request_seq_by_id.get(rid) == seq]
+    _order_seqs[:] = [seq for seq, _ in live]
+    _order_ids[:] = [rid for _, rid in live]
+
+async def list_stored_requests(limit: int, cursor: int) -> tuple:
+    """Return one page of (request_id, raw JSON record) pairs and the cursor for the next page"""
+    if redis_client:
+        # Page the creation-order index past the cursor's sequence number; ids whose
+        # record has expired are dropped from the index as they are found
+        page = []
+        while len(page) < limit:
+            entries = await redis_client.zrangebyscore(
+                REDIS_ORDER_KEY, f"({cursor}", "+inf", start=0, num=limit - len(page), withscores=True
+            )
+            if not entries:
+                return page, None
+            ids = [rid for rid, _ in entries]
+            values = await redis_client.mget([f"req:{rid}" for rid in ids])
+            expired = [rid for rid, raw in zip(ids, values) if raw is None]
+            if expired:
+                await redis_client.zrem(REDIS_ORDER_KEY, *expired)
+            page.extend((rid, raw.encode()) for rid, raw in zip(ids, values) if raw is not None)
+            cursor = int(entries[-1][1])
+        more = await redis_client.zrangebyscore(REDIS_ORDER_KEY, f"({cursor}", "+inf", start=0, num=1)
+        return page, (str(cursor) if more else None)
+    
+    # Seek past the cursor's sequence number, skipping ids that have since expired
+    page = []
+    i = bisect_right(_order_seqs, cursor)
+    while i < len(_order_ids) and len(page) < limit:
+        record = video_requests_db.get(_order_ids[i])
+        if record is not None and request_seq_by_id.get(_order_ids[i]) == _order_seqs[i]:
+            page.append((_order_ids[i], orjson.dumps(record)))
+        i += 1
+    return page, (str(_order_seqs[i - 1]) if page and i < len(_order_ids) else None)
+
+# Status lookups - one upstream call per video_id at a time, shared for a few seconds
+async def _fetch_and_cache_status(service: HeyGenService, video_id: str) -> Dict[str, Any]:
+    try:
+        result = await service.get_video_status(video_id)
+        now = time.monotonic()
+        if len(_status_cache) >= STATUS_CACHE_MAX_ENTRIES:
+            for vid, (fetched_at, _) in list(_status_cache.items()):
+                if now - fetched_at >= STATUS_CACHE_TTL_SEC:
+                    del _status_cache[vid]
+        _status_cache[video_id] = (now, result)
+        return result
+    finally:
+        _status_inflight.pop(video_id, None)
+
+async def fetch_video_status(service: HeyGenService, video_id: str) -> Dict[str, Any]:
+    """Get video status, reusing a fresh cached result or an in-flight HeyGen call"""
+    cached = _status_cache.get(video_id)
+    if cached and time.monotonic() - cached[0] < STATUS_CACHE_TTL_SEC:
+        return cached[1]
+    
+    inflight = _status_inflight.get(video_id)
+    if inflight is None:
+        inflight = asyncio.ensure_future(_fetch_and_cache_status(service, video_id))
+        _status_inflight[video_id] = inflight
+    # Shield so one cancelled caller doesn't cancel the lookup for everyone else
+    return await asyncio.shield(inflight)
+
+def build_status_response(request_id: Optional[str], video_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a HeyGen status payload to VideoRetrievalResponse fields"""
+    status = data["status"]
+    response_data = {
+        "success": True,
+        "message": f"Video status: {status}",
+        "request_id": request_id,
+        "video_id": video_id,
+        "status": status
+    }
+    
+    # Add additional data if video is completed
+    if status == "completed":
+        response_data.update({
+            "video_url": data.get("video_url"),
+            "caption_url": data.get("caption_url"),
+            "thumbnail_url": data.get("thumbnail_url"),
+            "duration": data.get("duration"),
+            "created_at": str(data.get("created_at")) if data.get("created_at") else None
+        })
+    elif status == "failed":
+        response_data["message"] = f"Video generation failed: {data.get('error', 'Unknown error')}"
+    
+    return response_data
+
+async def persist_terminal_status(request_id: Optional[str], response_data: Dict[str, Any]):
+    """Keep a completed/failed result with the request so it is never fetched again"""
+    if not request_id:
+        return
+    stored = await load_request(request_id)
+    if not stored or stored.terminal:
+        return
+    stored.status = response_data["status"]
+    stored.video_url = response_data.get("video_url")
+    stored.caption_url = response_data.get("caption_url")
+    stored.thumbnail_url = response_data.get("thumbnail_url")
+    stored.duration = response_data.get("duration")
+    stored.video_created_at = response_data.get("created_at")
+    if stored.status == "failed":
+        stored.error_message = response_data["message"]
+    await save_request(request_id, stored)
+
+def build_terminal_response(request_id: str, record: VideoRequestRecord) -> Dict[str, Any]:
+    """Rebuild the VideoRetrievalResponse fields for a completed/failed record"""
+    failed = record.status == "failed"
     return {
-        "message": "HeyGen Video Generation API is running on Render",
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "platform": "Render"
+        # A failure without a video_id means HeyGen never accepted the submission
+        "success": not (failed and record.video_id is None),
+        "message": record.error_message if failed else f"Video status: {record.status}",
+        "request_id": request_id,
+        "video_id": record.video_id,
+        "status": record.status,
+        "video_url": record.video_url,
+        "caption_url": record.caption_url,
+        "thumbnail_url": record.thumbnail_url,
+        "duration": record.duration,
+        "created_at": record.video_created_at
     }
 
-@app.get("/health", tags=["Health"])
-async def health_check():
-    """Detailed health check for Render"""
+# Status push
+def unsubscribe(request_id: str, websocket: WebSocket):
+    subs = subscribers.get(request_id)
+    if subs is not None:
+        subs.discard(websocket)
+        if not subs:
+            subscribers.pop(request_id, None)
+
+async def notify_subscribers(request_id: str, message: Dict[str, Any], close: bool = False, close_code: int = 1000):
+    """Send a status update to every WebSocket subscribed to request_id"""
+    payload = encode_status(message)
+    for ws in list(subscribers.get(request_id, ())):
+        try:
+            await ws.send_text(payload)
+            if close:
+                await ws.close(code=close_code)
+        except Exception as e:
+            logger.warning(f"Dropping WebSocket subscriber for {request_id}: {e}")
+            unsubscribe(request_id, ws)
+            continue
+        if close:
+            unsubscribe(request_id, ws)
+
+async def poll_video(request_id: str, video_id: Optional[str]):
+    """Poll HeyGen until the video reaches a terminal status or nobody is listening, pushing each change"""
+    last_status = None
+    deadline = time.monotonic() + STATUS_POLL_MAX_SEC
+    try:
+        while time.monotonic() < deadline:
+            # Every subscriber has gone; the next WebSocket starts a fresh poller
+            if not subscribers.get(request_id):
+                return
+            
+            # Still queued, possibly on another worker: wait for the stored record to get a video_id
+            if video_id is None:
+                stored = await load_request(request_id)
+                if stored is None:
+                    await notify_subscribers(request_id, {
+                        "success": False,
+                        "message": "Request not found",
+                        "request_id": request_id,
+                        "video_id": None,
+                        "status": None
+                    }, close=True)
+                    return
+                if stored.terminal:
+                    await notify_subscribers(request_id, build_terminal_response(request_id, stored), close=True)
+                    return
+                video_id = stored.video_id
+                if video_id is None:
+                    await asyncio.sleep(QUEUED_POLL_INTERVAL_SEC)
+                    continue
+            
+            service = get_heygen_service()
+            try:
+                result = await fetch_video_status(service, video_id)
+            except HTTPException as e:
+                logger.warning(f"Status poll failed: video_id={video_id}, error={e.detail}")
+                result = {}
+            
+            if "data" in result and "status" in result["data"]:
+                status = result["data"]["status"]
+                if status != last_status:
+                    last_status = status
+                    message = build_status_response(request_id, video_id, result["data"])
+                    if status in TERMINAL_STATUSES:
+                        await persist_terminal_status(request_id, message)
+                    await notify_subscribers(request_id, message, close=status in TERMINAL_STATUSES)
+                if status in TERMINAL_STATUSES:
+                    return
+            
+            await asyncio.sleep(STATUS_POLL_INTERVAL_SEC)
+        
+        logger.warning(f"Status polling timed out: request_id={request_id}, video_id={video_id}")
+        await notify_subscribers(request_id, {
+            "success": False,
+            "message": "Timed out waiting for video status; use /retrieve to check again",
+            "request_id": request_id,
+            "video_id": video_id,
+            "status": last_status
+        }, close=True, close_code=1011)
+    finally:
+        status_pollers.pop(request_id, None)
+
+def ensure_poller(request_id: str, video_id: Optional[str]):
+    """Start a status poller for request_id unless one is already running"""
+    if request_id not in status_pollers:
+        status_pollers[request_id] = asyncio.create_task(poll_video(request_id, video_id))
+
+async def submit_generation(request_id: str, request: VideoGenerationRequest):
+    """Submit a queued request to HeyGen and start polling its status"""
     service = get_heygen_service()
-    return {
+    try:
+        # Call HeyGen API
+        result = await service.generate_video(request)
+        
+        if "data" in result and "video_id" in result["data"]:
+            video_id = result["data"]["video_id"]
+            
+            stored = await load_request(request_id)
+            if stored is None:
+                # Evicted from the bounded store while HeyGen was answering; HeyGen has
+                # accepted the job, so recreate the record rather than report a failure
+                logger.warning(f"Request record missing after submission, re-saving: request_id={request_id}")
+                stored = VideoRequestRecord.from_request(request, video_id, "processing")
+                await save_request(request_id, stored, created=True)
+            else:
+                stored.video_id = video_id
+                stored.status = "processing"
+                await save_request(request_id, stored)
+            
+            logger.info(f"Video generation initiated on Render: request_id={request_id}, video_id={video_id}")
+            return
+        
+        logger.error(f"Unexpected API response: {result}")
+        error = "Unexpected response from video generation service"
+    except HTTPException as e:
+        error = e.detail
+    except Exception as e:
+        error = str(e)
+    
+    logger.error(f"Video generation failed: request_id={request_id}, error={error}")
+    response_data = {
+        "success": False,
+        "message": f"Video generation failed: {error}",
+        "request_id": request_id,
+        "video_id": None,
+        "status": "failed"
+    }
+    await persist_terminal_status(request_id, response_data)
+    await notify_subscribers(request_id, response_data, close=True)
+
+# Health responses are pre-serialized once a second and served as raw bytes
+def render_health(app: FastAPI):
+    timestamp = now_iso()
+    app.state.root_bytes = orjson.dumps({
+        "message": "HeyGen Video Generation API is running on Render",
+        "status": "healthy",
+        "timestamp": timestamp,
+        "platform": "Render"
+    })
+    app.state.health_bytes = orjson.dumps({
         "status": "healthy",
         "api_key_configured": bool(HEYGEN_API_KEY),
-        "service_initialized": bool(service),
+        "service_initialized": bool(get_heygen_service()),
         "template_id": TEMPLATE_ID,
         "port": PORT,
         "platform": "Render",
-        "timestamp": datetime.now().isoformat()
-    }
+        "timestamp": timestamp
+    })
+
+async def refresh_health(app: FastAPI):
+    while True:
+        await asyncio.sleep(1)
+        render_health(app)
+
+# API Routes
+@app.get("/", tags=["Health"])
+async def root():
+    """Health check endpoint"""
+    return Response(app.state.root_bytes, media_type="application/json")
+
+@app.get("/health", tags=["Health"])
+async def health_check():
+    """Detailed health check for Render"""
+    return Response(app.state.health_bytes, media_type="application/json")
 
-@app.post("/generate", response_model=VideoGenerationResponse, tags=["Video Generation"])
-async def generate_video(request: VideoGenerationRequest):
-    """Generate a new AI video"""
+@app.post(
+    "/generate",
+    tags=["Video Generation"],
+    openapi_extra=openapi_body(VideoGenerationRequest),
+    responses=openapi_response(VideoGenerationResponse)
+)
+async def generate_video(
+    background_tasks: BackgroundTasks,
+    request: VideoGenerationRequest = Depends(json_body(VideoGenerationRequest))
+):
+    """Queue a new AI video for generation"""
     
     service = get_heygen_service()
     if not service:
@@ -241,52 +758,29 @@ async def generate_video(request: VideoGenerationRequest):
     # Generate unique request ID
     request_id = str(uuid.uuid4())
     
-    try:
-        # Call HeyGen API
-        result = service.generate_video(request)
-        
-        if "data" in result and "video_id" in result["data"]:
-            video_id = result["data"]["video_id"]
-            
-            # Store request mapping
-            video_requests_db[request_id] = {
-                "video_id": video_id,
-                "script_text": request.script_text,
-                "template_id": request.template_id or TEMPLATE_ID,
-                "use_captions": request.use_captions,
-                "avatar_id": request.avatar_id,
-                "voice_id": request.voice_id,
-                "title": request.title,
-                "created_at": datetime.now().isoformat(),
-                "status": "processing",
-                "platform": "render"
-            }
-            
-            logger.info(f"Video generation initiated on Render: request_id={request_id}, video_id={video_id}")
-            
-            return VideoGenerationResponse(
-                success=True,
-                message="Video generation initiated successfully",
-                request_id=request_id,
-                video_id=video_id,
-                estimated_time="2-5 minutes"
-            )
-        else:
-            logger.error(f"Unexpected API response: {result}")
-            raise HTTPException(
-                status_code=500,
-                detail="Unexpected response from video generation service"
-            )
-            
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Video generation failed: {e}")
-        raise HTTPException(status_code=500, detail=f"Video generation failed: {str(e)}")
+    # Store request mapping; video_id is filled in once HeyGen accepts the job
+    await save_request(request_id, VideoRequestRecord.from_request(request, None, "queued"), created=True)
+    
+    background_tasks.add_task(submit_generation, request_id, request)
+    
+    logger.info(f"Video generation queued on Render: request_id={request_id}")
+    
+    return struct_response(VideoGenerationResponse(
+        success=True,
+        message="Video generation queued",
+        request_id=request_id,
+        video_id=None,
+        estimated_time="2-5 minutes"
+    ))
 
-@app.post("/retrieve", response_model=VideoRetrievalResponse, tags=["Video Retrieval"])
-async def retrieve_video(request: VideoRetrievalRequest):
-    """Retrieve video status and details using video_id"""
+@app.post(
+    "/retrieve",
+    tags=["Video Retrieval"],
+    openapi_extra=openapi_body(VideoRetrievalRequest),
+    responses=openapi_response(VideoRetrievalResponse)
+)
+async def retrieve_video(request: VideoRetrievalRequest = Depends(json_body(VideoRetrievalRequest))):
+    """Retrieve video status and details using request_id or video_id"""
     
     service = get_heygen_service()
     if not service:
@@ -296,37 +790,49 @@ async def retrieve_video(request: VideoRetrievalRequest):
         )
     
     video_id = request.video_id
+    request_id = request.request_id
+    
+    if request_id:
+        stored = await load_request(request_id)
+        if not stored:
+            raise HTTPException(status_code=404, detail="Request not found")
+        video_id = stored.video_id
+    elif video_id:
+        request_id = await find_request_id(video_id)
+        stored = await load_request(request_id) if request_id else None
+    else:
+        raise HTTPException(status_code=400, detail="Either request_id or video_id is required")
+    
+    # Completed/failed results never change, so serve them without calling HeyGen
+    if stored and stored.terminal:
+        return struct_response(
+            VideoRetrievalResponse(**build_terminal_response(request_id, stored)),
+            headers={"Cache-Control": TERMINAL_CACHE_CONTROL}
+        )
+    
+    if not video_id:
+        return struct_response(VideoRetrievalResponse(
+            success=True,
+            message="Video status: queued",
+            request_id=request_id,
+            status="queued"
+        ))
     
     try:
-        # Get video status from HeyGen directly
-        result = service.get_video_status(video_id)
+        # Get video status from HeyGen, shared with concurrent callers
+        result = await fetch_video_status(service, video_id)
         
         if "data" in result and "status" in result["data"]:
-            data = result["data"]
-            status = data["status"]
-            
-            response_data = {
-                "success": True,
-                "message": f"Video status: {status}",
-                "request_id": None,
-                "video_id": video_id,
-                "status": status
-            }
+            status = result["data"]["status"]
+            response_data = build_status_response(request_id, video_id, result["data"])
             
-            # Add additional data if video is completed
-            if status == "completed":
-                response_data.update({
-                    "video_url": data.get("video_url"),
-                    "caption_url": data.get("caption_url"),
-                    "thumbnail_url": data.get("thumbnail_url"),
-                    "duration": data.get("duration"),
-                    "created_at": str(data.get("created_at")) if data.get("created_at") else None
-                })
-            elif status == "failed":
-                response_data["message"] = f"Video generation failed: {data.get('error', 'Unknown error')}"
+            headers = None
+            if status in TERMINAL_STATUSES:
+                await persist_terminal_status(request_id, response_data)
+                headers = {"Cache-Control": TERMINAL_CACHE_CONTROL}
             
             logger.info(f"Video status retrieved: video_id={video_id}, status={status}")
-            return VideoRetrievalResponse(**response_data)
+            return struct_response(VideoRetrievalResponse(**response_data), headers=headers)
             
         else:
             logger.error(f"Unexpected API response: {result}")
@@ -341,27 +847,71 @@ async def retrieve_video(request: VideoRetrievalRequest):
         logger.error(f"Video retrieval failed: {e}")
         raise HTTPException(status_code=500, detail=f"Video retrieval failed: {str(e)}")
         
+@app.websocket("/ws/{request_id}")
+async def video_status_ws(websocket: WebSocket, request_id: str):
+    """Push status updates for a request until the video completes or fails"""
+    await websocket.accept()
+    
+    stored = await load_request(request_id)
+    if not stored:
+        await websocket.close(code=4404, reason="Request not found")
+        return
+    if stored.terminal:
+        await websocket.send_text(encode_status(build_terminal_response(request_id, stored)))
+        await websocket.close()
+        return
+    if not get_heygen_service():
+        await websocket.close(code=1011, reason="Service not configured")
+        return
+    
+    subscribers.setdefault(request_id, set()).add(websocket)
+    # The request may have been generated on another worker or before a restart;
+    # for queued requests the poller waits until the record gets its video_id
+    ensure_poller(request_id, stored.video_id)
+    try:
+        # Incoming frames (text or binary) are ignored; we only wait for the disconnect
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        unsubscribe(request_id, websocket)
+
 @app.get("/requests", tags=["Management"])
-async def list_requests():
-    """List all video requests (for debugging/monitoring)"""
-    return {
-        "platform": "Render",
-        "total_requests": len(video_requests_db),
-        "requests": video_requests_db
-    }
+async def list_requests(limit: int = Query(100, ge=1, le=1000), cursor: Optional[str] = None):
+    """List video requests page by page (for debugging/monitoring)"""
+    try:
+        cursor_value = int(cursor) if cursor else 0
+    except ValueError:
+        cursor_value = -1
+    if cursor_value < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    page, next_cursor = await list_stored_requests(limit, cursor_value)
+    
+    # Records are already JSON bytes, so splice them into the envelope instead of re-encoding
+    body = b"".join((
+        b'{"platform":"Render","count":%d,"next_cursor":%s,"requests":{' % (len(page), orjson.dumps(next_cursor)),
+        b",".join(orjson.dumps(rid) + b":" + raw for rid, raw in page),
+        b"}}"
+    ))
+    return Response(body, media_type="application/json")
 
 @app.get("/requests/{request_id}", tags=["Management"])
 async def get_request_details(request_id: str):
     """Get details of a specific request"""
-    if request_id not in video_requests_db:
+    stored = await load_request(request_id)
+    if not stored:
         raise HTTPException(status_code=404, detail="Request not found")
     
-    return video_requests_db[request_id]
+    return stored
 
 # Error handlers
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={"success": False, "message": exc.detail, "status_code": exc.status_code, "platform": "Render"}
     )
@@ -369,11 +919,28 @@ async def http_exception_handler(request, exc):
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     logger.error(f"Unhandled exception on Render: {exc}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"success": False, "message": "Internal server error", "status_code": 500, "platform": "Render"}
     )
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=PORT)
+    # The in-memory fallback store is per-process, so only scale out workers with Redis
+    default_workers = (os.cpu_count() or 2) if REDIS_URL else 1
+    workers = int(os.getenv("WEB_CONCURRENCY", default_workers))
+    if workers > 1 and not REDIS_URL:
+        logger.warning(
+            f"Running {workers} workers without REDIS_URL: request lookups, /requests and "
+            "WebSocket pushes only see requests created on the same worker"
+        )
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=PORT,
+        workers=workers,
+        loop="auto",  # uvloop when installed (not on Windows), asyncio otherwise
+        http="httptools",
+        access_log=False,
+        log_level="warning"
+    )